@@ -3,52 +3,51 @@
 """
 Script to dump the vocabulary and metadata from the o200k_base tokenizer.
 This will be used as a reference for building a custom tokenizer.
+
+Pass --with-bytes to also store each token's raw bytes (hex in the CSV,
+binary in the Parquet file); the analysis scripts never read them.
 """
-import tiktoken
-from tiktoken.load import load_tiktoken_bpe
+import argparse
+
 import pandas as pd
 import numpy as np
 
-# Load the raw token→rank mapping
-mergeable_ranks = load_tiktoken_bpe(
-    "https://openaipublic.blob.core.windows.net/encodings/o200k_base.tiktoken",
-    expected_hash="446a9538cb6c348e3516120d7c08b09f57c36495e2acfffe59a5bf8b0cfb1a2d",
-)
+import vocab
+
+parser = argparse.ArgumentParser(description=__doc__,
+                                 formatter_class=argparse.RawDescriptionHelpFormatter)
+parser.add_argument("--with-bytes", action="store_true",
+                    help="include the raw token bytes column in the output files")
+args = parser.parse_args()
+
+# Load the tokenizer once; it carries both the special tokens and the
+# raw token→rank mapping, so the BPE file is only parsed a single time
+enc = vocab.enc()
+mergeable_ranks = enc._mergeable_ranks
 
 # Flip it to rank → token for vocab dump
 id_to_token = {rank: token for token, rank in mergeable_ranks.items()}
 
-# Initialize the tokenizer to get special tokens
-enc = tiktoken.get_encoding("o200k_base")
-
-# Create a comprehensive vocabulary dictionary
-vocab_data = []
-for idx, token in id_to_token.items():
-    # Convert bytes to readable string
-    try:
-        decoded_str = token.decode("utf-8")
-    except UnicodeDecodeError:
-        decoded_str = token.decode("utf-8", errors="replace")
-    
-    # Check if it's a special token
-    is_special = False
-    for special_token in enc._special_tokens.values():
-        if token == special_token:
-            is_special = True
-            break
-    
-    vocab_data.append({
-        "token_id": idx,
-        "token_bytes": token.hex(),  # Store raw bytes as hex string
-        "token_string": decoded_str,
-        "token_length": len(token),
-        "is_special": is_special,
-        "is_printable": decoded_str.isprintable(),
-        "is_ascii": decoded_str.isascii(),
-    })
-
-# Convert to DataFrame
-df = pd.DataFrame(vocab_data)
+# Build each column once as an array rather than a dict per token
+n = len(id_to_token)
+token_ids = np.fromiter(id_to_token.keys(), dtype=np.int64, count=n)
+raw_tokens = list(id_to_token.values())
+# _special_tokens maps token string → token id, so membership is tested on ids
+special_ids = frozenset(enc._special_tokens.values())
+# errors="replace" leaves valid UTF-8 untouched, so no strict first attempt is needed
+decoded = [token.decode("utf-8", errors="replace") for token in raw_tokens]
+
+df = pd.DataFrame({
+    "token_id": token_ids,
+    "token_string": decoded,
+    "token_length": np.fromiter(map(len, raw_tokens), dtype=np.int64, count=n),
+    "is_special": np.fromiter((i in special_ids for i in id_to_token), dtype=bool, count=n),
+    "is_printable": np.fromiter((s.isprintable() for s in decoded), dtype=bool, count=n),
+    "is_ascii": np.fromiter((s.isascii() for s in decoded), dtype=bool, count=n),
+})
+
+if args.with_bytes:
+    df.insert(1, "token_bytes", raw_tokens)
 
 # Add tokenizer name column
 df['tokenizer_name'] = 'o200k_base'
@@ -56,8 +55,15 @@ df['tokenizer_name'] = 'o200k_base'
 # Sort by token_id to maintain order
 df = df.sort_values("token_id")
 
-# Save to CSV with detailed metadata
-df.to_csv("o200k_vocab_detailed.csv", index=False, lineterminator='\n')
+# Save to CSV with detailed metadata; bytes are written as hex strings there
+df_csv = df
+if args.with_bytes:
+    df_csv = df.assign(token_bytes=[t.hex() for t in df["token_bytes"]])
+df_csv.to_csv("o200k_vocab_detailed.csv", index=False, lineterminator='\n')
+
+# Parquet copy for the analysis scripts: typed, columnar and much faster to load.
+# token_bytes, if present, is stored as a binary column
+df.to_parquet("o200k_vocab_detailed.parquet", index=False, compression="zstd")
 
 # Print some statistics
 print("\nVocabulary Statistics:")
@@ -69,8 +75,9 @@ print(f"ASCII tokens: {df['is_ascii'].sum()}")
 
 # Example: print first 20 tokens with their metadata
 print("\nFirst 20 tokens:")
-for _, row in df.head(20).iterrows():
-    print(f"ID: {row['token_id']:4d} | Length: {row['token_length']:2d} | Special: {row['is_special']} | String: {row['token_string']}")
+head = df.head(20)[["token_id", "token_length", "is_special", "token_string"]]
+for tid, tlen, special, tstr in head.itertuples(index=False, name=None):
+    print(f"ID: {tid:4d} | Length: {tlen:2d} | Special: {special} | String: {tstr}")
 
 
 
@@ -108,8 +115,6 @@ Each of those gets mapped to a separate token ID.
 
 """
 
-enc = tiktoken.get_encoding("o200k_base")
-
 word = "giraffe"
 
 tokens = enc.encode(word, disallowed_special=())
@@ -1,48 +1,24 @@
 #! /usr/bin/env python3
 """token2chars_ratio_analysis
 
-Usage:
-  token2chars_ratio_analysis CSV [-W WORDS | --words=WORDS] [--words_file=FILE]
-  token2chars_ratio_analysis -h | --help
-  token2chars_ratio_analysis --version
-
-Arguments:
-  CSV                   Path to o200k_vocab_detailed.csv
-
-Options:
-  -W WORDS --words=WORDS        Comma-separated words to tokenize and analyze
-  --words_file=FILE             Path or URL to newline-separated words file
-  -h --help                     Show this help message and exit
-  --version                     Show version information and exit
+Summarize the o200k_base vocabulary and, optionally, tokenize a list of
+words and report their token/char ratios.
 """
+import argparse
 import sys
-from docopt import docopt
 import pandas as pd
 import numpy as np
-import tiktoken
 import unicodedata
 import urllib.request
 import urllib.parse
 import os
-from typing import List
-
-__version__ = '0.1.0'
+from itertools import chain
+from typing import List, Optional, Tuple
 
+import vocab
+from tokenizer_cache import encode_batch_cached
 
-def load_vocab(path: str) -> pd.DataFrame:
-    """Load vocab CSV with proper dtypes."""
-    dtypes = {
-        'token_id': np.int64,
-        'token_bytes': str,
-        'token_string': str,
-        'token_length': np.int64,
-        'is_special': bool,
-        'is_printable': bool,
-        'is_ascii': bool,
-        'tokenizer_name': str
-    }
-    df_o200_vocab = pd.read_csv(path, dtype=dtypes)
-    return df_o200_vocab
+__version__ = '0.1.0'
 
 
 def summary_stats(df_o200_vocab: pd.DataFrame) -> None:
@@ -65,64 +41,113 @@ def length_distribution(df_o200_vocab: pd.DataFrame) -> None:
     counts = lengths.value_counts().sort_index()
     print("\nLength → Count:")
     print(counts.to_string())
-    top_long = df_o200_vocab.nlargest(10, 'token_length')
-    top_short = df_o200_vocab.nsmallest(10, 'token_length')
+    cols = ['token_id', 'token_length', 'token_string']
+    top_long = df_o200_vocab.nlargest(10, 'token_length')[cols]
+    top_short = df_o200_vocab.nsmallest(10, 'token_length')[cols]
     print("\nTop 10 longest tokens:")
-    for _, row in top_long.iterrows():
-        print(f"  ID {row.token_id:5d}: {row.token_length:2d} bytes → {row.token_string!r}")
+    for tid, tlen, tstr in top_long.itertuples(index=False, name=None):
+        print(f"  ID {tid:5d}: {tlen:2d} bytes → {tstr!r}")
     print("\nTop 10 shortest tokens:")
-    for _, row in top_short.iterrows():
-        print(f"  ID {row.token_id:5d}: {row.token_length:2d} bytes → {row.token_string!r}")
+    for tid, tlen, tstr in top_short.itertuples(index=False, name=None):
+        print(f"  ID {tid:5d}: {tlen:2d} bytes → {tstr!r}")
 
 
 def categorize_tokens(df_o200_vocab: pd.DataFrame) -> None:
-    """Bucket tokens by unicode category or whitespace prefix for o200k_base vocab."""
-    df_o200_vocab['token_string'] = df_o200_vocab['token_string'].fillna('')
-    def bucket(s: str) -> str:
-        if not isinstance(s, str) or s == '':
+    """Bucket tokens by unicode category or whitespace prefix for o200k_base vocab.
+
+    The vocab frame may be the shared vocab.vocab() instance, so it is only read.
+    """
+    strings = df_o200_vocab['token_string']
+    # Only copy the column when it has NaNs, which only come from CSV input
+    na_mask = strings.isna()
+    if na_mask.any():
+        strings = strings.mask(na_mask, '')
+    first_chars = strings.str.slice(0, 1)
+    # Every bucket depends only on the leading character, and only a few
+    # thousand distinct ones exist: bucket each distinct character once and
+    # broadcast back through the factorized codes.
+    majors = {'L': 'letter', 'N': 'number', 'P': 'punctuation', 'Z': 'space'}
+    def bucket(c: str) -> str:
+        if c == '':
             return 'empty'
-        if s.startswith('Ġ'):
+        if c == 'Ġ':
             return 'whitespace_prefixed'
-        cat = unicodedata.category(s[0])
-        if cat.startswith('L'): return 'letter'
-        if cat.startswith('N'): return 'number'
-        if cat.startswith('P'): return 'punctuation'
-        if cat.startswith('Z'): return 'space'
-        return 'other'
-    df_o200_vocab['bucket'] = df_o200_vocab['token_string'].map(bucket)
+        return majors.get(unicodedata.category(c)[0], 'other')
+    codes, uniques = pd.factorize(first_chars)
+    buckets = np.array([bucket(c) for c in uniques], dtype=object)
+    bucket_col = pd.Series(buckets[codes], name='bucket')
     print("\n=== Unicode Buckets ===")
-    print(df_o200_vocab['bucket'].value_counts().to_string())
+    print(bucket_col.value_counts().to_string())
+
+
+def compute_stats(flat_ids: np.ndarray, token_counts: np.ndarray, char_counts: np.ndarray,
+                  token_length_arr: np.ndarray) -> Tuple[np.ndarray, np.ndarray, np.ndarray]:
+    """Return avg byte length, tokens/char and chars/token per word from flattened token ids.
 
+    flat_ids holds every word's token ids back to back; token_counts gives
+    how many belong to each word. Ratios with a zero denominator are NaN.
+    """
+    # Sum byte lengths per word in one pass; bincount copes with words
+    # that encode to zero tokens, unlike reduceat.
+    word_idx = np.repeat(np.arange(len(token_counts)), token_counts)
+    byte_sums = np.bincount(word_idx, weights=token_length_arr[flat_ids],
+                            minlength=len(token_counts))
+    safe_tc = np.where(token_counts, token_counts, np.nan)
+    safe_cc = np.where(char_counts, char_counts, np.nan)
+    return byte_sums / safe_tc, token_counts / safe_cc, char_counts / safe_tc
 
-def analyze_words(words: List[str], df_o200_vocab: pd.DataFrame, enc) -> None:
-    """Tokenize each word and show ID, string, count, avg byte-len, and token/char ratios."""
+
+def analyze_words(words: List[str], token_length_arr: np.ndarray,
+                  token_string_arr: np.ndarray, enc) -> None:
+    """Tokenize each word and show ID, string, count, avg byte-len, and token/char ratios.
+
+    The arrays are indexed by token_id, e.g. vocab.token_len_arr() / vocab.token_str_arr().
+    """
     print("\n=== Per-Word Tokenization & Ratios ===")
-    for word in words:
-        token_ids = enc.encode(word)
-        sub = df_o200_vocab.set_index('token_id').loc[token_ids]
+    all_ids = enc.encode_batch(words, num_threads=os.cpu_count())
+    for word, token_ids in zip(words, all_ids):
+        ids_np = np.asarray(token_ids, dtype=np.int64)
         token_count = len(token_ids)
         char_count = len(word)
-        avg_len = sub['token_length'].mean()
+        avg_len = token_length_arr[ids_np].mean() if token_count else float('nan')
         tokens_per_char = token_count / char_count if char_count else float('nan')
         chars_per_token = char_count / token_count if token_count else float('nan')
         print(f"\n>> '{word}': {token_count} tokens, {char_count} chars, "
               f"avg {avg_len:.2f} bytes/token, "
               f"{tokens_per_char:.2f} tokens/char, {chars_per_token:.2f} chars/token")
-        for tid, txt in zip(token_ids, sub['token_string']):
+        for tid, txt in zip(token_ids, token_string_arr[ids_np]):
             print(f"   • ID {tid:5d}: {txt!r}")
 
 
+def parse_args(argv: Optional[List[str]] = None) -> argparse.Namespace:
+    """Parse command-line arguments."""
+    parser = argparse.ArgumentParser(
+        prog='token2chars_ratio_analysis',
+        description=__doc__,
+        formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('vocab', metavar='VOCAB',
+                        help='Path to o200k_vocab_detailed.parquet (or .csv)')
+    parser.add_argument('-W', '--words', metavar='WORDS',
+                        help='Comma-separated words to tokenize and analyze')
+    parser.add_argument('--words_file', metavar='FILE',
+                        help='Path or URL to newline-separated words file')
+    parser.add_argument('--no_cache', action='store_true',
+                        help='Do not read or update the on-disk word encoding cache')
+    parser.add_argument('--version', action='version', version=__version__)
+    return parser.parse_args(argv)
+
+
 def main():
-    args = docopt(__doc__, version=__version__)
-    df_o200_vocab = load_vocab(args['CSV'])
-    enc = tiktoken.get_encoding("o200k_base")
+    args = parse_args()
+    df_o200_vocab = vocab.vocab(args.vocab)
+    enc = vocab.enc()
 
     summary_stats(df_o200_vocab)
     length_distribution(df_o200_vocab)
     categorize_tokens(df_o200_vocab)
 
     words: List[str] = []
-    words_file = args.get('--words_file')
+    words_file = args.words_file
     if words_file:
         if words_file.startswith(('http://', 'https://')):
             print(f"Downloading word list from URL: {words_file}")
@@ -140,33 +165,36 @@ def main():
                 lines = f.read().splitlines()
         words = [line.strip() for line in lines if line.strip()]
         print(f"Loaded {len(words)} words")
-    elif args.get('--words'):
-        words = args['--words'].split(',')
+    elif args.words:
+        words = args.words.split(',')
         print(f"Using {len(words)} provided words")
 
     if words:
         total = len(words)
         print(f"\nAnalyzing {total} words...")
-        records = []
-        for idx, word in enumerate(words, start=1):
-            if total > 100 and idx % 100 == 0:
-                print(f"  Processed {idx}/{total} words")
-            token_ids = enc.encode(word)
-            sub = df_o200_vocab.set_index('token_id').loc[token_ids]
-            tc = len(token_ids)
-            cc = len(word)
-            avg_len = sub['token_length'].mean()
-            t2c = tc / cc if cc else float('nan')
-            c2t = cc / tc if tc else float('nan')
-            records.append({
-                'word': word,
-                'token_count': tc,
-                'char_count': cc,
-                'avg_byte_length': avg_len,
-                'tokens_per_char': t2c,
-                'chars_per_token': c2t
-            })
-        out_df = pd.DataFrame(records)
+        token_length_arr = vocab.token_len_arr(args.vocab)
+        # Tokenize each distinct word once; word_codes maps rows back to them
+        word_codes, unique_words = pd.factorize(np.asarray(words, dtype=object))
+        n_unique = len(unique_words)
+        if n_unique < total:
+            print(f"Tokenizing {n_unique} unique words")
+        if args.no_cache:
+            all_ids = enc.encode_batch(unique_words.tolist(), num_threads=os.cpu_count())
+        else:
+            all_ids = encode_batch_cached(unique_words.tolist(), "o200k_base")
+        token_counts = np.fromiter(map(len, all_ids), dtype=np.int64, count=n_unique)
+        char_counts = np.fromiter(map(len, unique_words), dtype=np.int64, count=n_unique)
+        flat_ids = np.fromiter(chain.from_iterable(all_ids), dtype=np.int64,
+                               count=int(token_counts.sum()))
+        avg_len, t2c, c2t = compute_stats(flat_ids, token_counts, char_counts, token_length_arr)
+        out_df = pd.DataFrame({
+            'word': words,
+            'token_count': token_counts[word_codes],
+            'char_count': char_counts[word_codes],
+            'avg_byte_length': avg_len[word_codes],
+            'tokens_per_char': t2c[word_codes],
+            'chars_per_token': c2t[word_codes]
+        })
         if total > 5:
             report_file = 'word_summary.csv'
             out_df.to_csv(report_file, index=False)
@@ -1,43 +1,31 @@
-import tiktoken
-from tiktoken.load import load_tiktoken_bpe
-import pandas as pd
+import os
 import numpy as np
 from typing import List
 
-def load_vocab(path: str) -> pd.DataFrame:
-    """Load vocab CSV with proper dtypes."""
-    dtypes = {
-        'token_id': np.int64,
-        'token_bytes': str,
-        'token_string': str,
-        'token_length': np.int64,
-        'is_special': bool,
-        'is_printable': bool,
-        'is_ascii': bool,
-        'tokenizer_name': str
-    }
-    df_o200_vocab = pd.read_csv(path, dtype=dtypes)
-    return df_o200_vocab
-
-
-df_o200_vocab = load_vocab("o200k_vocab_detailed.csv")
-enc = tiktoken.get_encoding("o200k_base")
-
-def analyze_words(words: List[str], df_o200_vocab: pd.DataFrame=df_o200_vocab, enc=enc) -> None:
+import vocab
+
+df_o200_vocab = vocab.vocab()
+enc = vocab.enc()
+# Lookup arrays indexed by token_id, shared through vocab so analyze_words never touches the DataFrame
+_tok_len = vocab.token_len_arr()
+_tok_str = vocab.token_str_arr()
+
+def analyze_words(words: List[str], token_length_arr: np.ndarray=_tok_len,
+                  token_string_arr: np.ndarray=_tok_str, enc=enc) -> None:
     """Tokenize each word and show ID, string, count, avg byte-len, and token/char ratios."""
     print("\n=== Per-Word Tokenization & Ratios ===")
-    for word in words:
-        token_ids = enc.encode(word)
-        sub = df_o200_vocab.set_index('token_id').loc[token_ids]
+    all_ids = enc.encode_batch(words, num_threads=os.cpu_count())
+    for word, token_ids in zip(words, all_ids):
+        ids_np = np.asarray(token_ids, dtype=np.int64)
         token_count = len(token_ids)
         char_count = len(word)
-        avg_len = sub['token_length'].mean()
+        avg_len = token_length_arr[ids_np].mean() if token_count else float('nan')
         tokens_per_char = token_count / char_count if char_count else float('nan')
         chars_per_token = char_count / token_count if token_count else float('nan')
         print(f"\n>> '{word}': {token_count} tokens, {char_count} chars, "
               f"avg {avg_len:.2f} bytes/token, "
               f"{tokens_per_char:.2f} tokens/char, {chars_per_token:.2f} chars/token")
-        for tid, txt in zip(token_ids, sub['token_string']):
+        for tid, txt in zip(token_ids, token_string_arr[ids_np]):
             print(f"   • ID {tid:5d}: {txt!r}")
 
 
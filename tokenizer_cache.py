@@ -0,0 +1,70 @@
+# tokenizer_cache.py
+"""
+Shared, cached access to tiktoken encodings.
+Loading o200k_base parses the full BPE file, so do it once per process.
+Word encodings can also be persisted across runs in a small sqlite database.
+"""
+import os
+import sqlite3
+from contextlib import closing
+from functools import lru_cache
+from typing import Dict, List
+
+import numpy as np
+import tiktoken
+
+CACHE_PATH = os.path.join(
+    os.environ.get("XDG_CACHE_HOME", os.path.expanduser("~/.cache")),
+    "token_minimizer", "enc_cache.db")
+
+# Stay below sqlite's default limit on bound parameters per statement
+_LOOKUP_CHUNK = 900
+
+
+@lru_cache(maxsize=None)
+def get_enc(name: str = "o200k_base") -> tiktoken.Encoding:
+    """Return the tiktoken encoding `name`, loading it only on first use."""
+    return tiktoken.get_encoding(name)
+
+
+def encode_batch_cached(words: List[str], name: str = "o200k_base",
+                        cache_path: str = CACHE_PATH) -> List[List[int]]:
+    """Encode `words` like Encoding.encode_batch, reusing encodings stored in `cache_path`.
+
+    Only words missing from the cache are sent to tiktoken; their token ids
+    are written back so later runs over overlapping word lists skip them.
+    If the cache cannot be created, read or written, the words it could not
+    supply are encoded directly, so a broken cache only costs speed.
+    """
+    distinct = list(dict.fromkeys(words))
+    found: Dict[str, List[int]] = {}
+    try:
+        cache_dir = os.path.dirname(cache_path)
+        if cache_dir:
+            os.makedirs(cache_dir, exist_ok=True)
+        with closing(sqlite3.connect(cache_path)) as con:
+            con.execute("CREATE TABLE IF NOT EXISTS encodings ("
+                        "encoding TEXT NOT NULL, word TEXT NOT NULL, token_ids BLOB NOT NULL, "
+                        "PRIMARY KEY (encoding, word))")
+            for start in range(0, len(distinct), _LOOKUP_CHUNK):
+                chunk = distinct[start:start + _LOOKUP_CHUNK]
+                rows = con.execute(
+                    "SELECT word, token_ids FROM encodings WHERE encoding = ? "
+                    f"AND word IN ({','.join('?' * len(chunk))})", [name, *chunk])
+                for word, blob in rows:
+                    found[word] = np.frombuffer(blob, dtype=np.uint32).tolist()
+            misses = [w for w in distinct if w not in found]
+            if misses:
+                encoded = get_enc(name).encode_batch(misses, num_threads=os.cpu_count())
+                found.update(zip(misses, encoded))
+                with con:
+                    con.executemany(
+                        "INSERT OR REPLACE INTO encodings VALUES (?, ?, ?)",
+                        ((name, w, np.asarray(ids, dtype=np.uint32).tobytes())
+                         for w, ids in zip(misses, encoded)))
+    except (OSError, sqlite3.Error):
+        misses = [w for w in distinct if w not in found]
+        if misses:
+            encoded = get_enc(name).encode_batch(misses, num_threads=os.cpu_count())
+            found.update(zip(misses, encoded))
+    return [found[w] for w in words]
@@ -0,0 +1,77 @@
+# vocab.py
+"""
+Process-wide access to the o200k_base encoder and vocabulary.
+Each getter computes its value on first call and returns the same object
+afterwards, so scripts and notebooks share one loaded copy. Treat the
+returned DataFrame and arrays as read-only: a mutation is seen by every
+other caller. Use .copy() first if you need to modify them.
+"""
+from functools import lru_cache
+from typing import Tuple
+
+import numpy as np
+import pandas as pd
+import tiktoken
+
+from tokenizer_cache import get_enc
+
+VOCAB_PATH = "o200k_vocab_detailed.parquet"
+
+VOCAB_COLUMNS = ['token_id', 'token_string', 'token_length',
+                 'is_special', 'is_printable', 'is_ascii']
+
+
+def load_vocab(path: str) -> pd.DataFrame:
+    """Load vocab Parquet (preferred) or CSV with proper dtypes."""
+    if path.endswith('.parquet'):
+        # Parquet keeps dtypes, and only the columns we use are materialized
+        return pd.read_parquet(path, columns=VOCAB_COLUMNS)
+    dtypes = {
+        'token_id': np.int64,
+        'token_bytes': str,
+        'token_string': str,
+        'token_length': np.int64,
+        'is_special': bool,
+        'is_printable': bool,
+        'is_ascii': bool,
+        'tokenizer_name': str
+    }
+    df_o200_vocab = pd.read_csv(path, dtype=dtypes)
+    return df_o200_vocab
+
+
+def token_arrays(df_o200_vocab: pd.DataFrame) -> Tuple[np.ndarray, np.ndarray]:
+    """Return token_length and token_string arrays whose position is the token_id."""
+    df_sorted = df_o200_vocab.sort_values('token_id')
+    token_ids = df_sorted['token_id'].to_numpy()
+    if not np.array_equal(token_ids, np.arange(len(token_ids))):
+        raise ValueError("token_id column must cover 0..N-1 without gaps")
+    token_length_arr = df_sorted['token_length'].to_numpy()
+    token_string_arr = df_sorted['token_string'].to_numpy(dtype=object)
+    return token_length_arr, token_string_arr
+
+
+def enc() -> tiktoken.Encoding:
+    """Return the shared o200k_base encoding."""
+    return get_enc("o200k_base")
+
+
+@lru_cache(maxsize=None)
+def vocab(path: str = VOCAB_PATH) -> pd.DataFrame:
+    """Return the vocab DataFrame loaded from `path`, shared by every caller."""
+    return load_vocab(path)
+
+
+@lru_cache(maxsize=None)
+def _arrays(path: str) -> Tuple[np.ndarray, np.ndarray]:
+    return token_arrays(vocab(path))
+
+
+def token_len_arr(path: str = VOCAB_PATH) -> np.ndarray:
+    """Return token byte lengths indexed by token_id."""
+    return _arrays(path)[0]
+
+
+def token_str_arr(path: str = VOCAB_PATH) -> np.ndarray:
+    """Return decoded token strings indexed by token_id."""
+    return _arrays(path)[1]